@@ -0,0 +1,47 @@
+/*
+ * Clientside formatting for the SPINE runs table.
+ *
+ * The update_table callback in app.py returns raw database rows into the
+ * "raw-store" component; formatRows shapes them into table rows and file
+ * path tooltips in the browser.
+ */
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    fmt: {
+        formatRows: function (rows) {
+            rows = rows || [];
+
+            function orNA(value) {
+                return value === null || value === undefined ? "N/A" : value;
+            }
+
+            function formatDate(value) {
+                // ISO timestamp -> "YYYY-MM-DD HH:MM:SS"
+                return value ? String(value).replace("T", " ").slice(0, 19) : "N/A";
+            }
+
+            var data = rows.map(function (row) {
+                var hasRange = row.event_min !== null && row.event_max !== null;
+                return {
+                    id: row.id,
+                    run: orNA(row.run),
+                    subrun: orNA(row.subrun),
+                    num_events: orNA(row.num_events),
+                    event_range: hasRange
+                        ? row.event_min + "-" + row.event_max
+                        : "N/A",
+                    file_name: row.file_name,
+                    spine_version: row.spine_version || "N/A",
+                    model_name: row.model_name || "N/A",
+                    created_at: formatDate(row.created_at),
+                };
+            });
+
+            // Tooltip shows full file path
+            var tooltips = rows.map(function (row) {
+                return {file_name: {value: row.file_path, type: "text"}};
+            });
+
+            return [data, tooltips];
+        },
+    },
+});
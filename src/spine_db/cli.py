@@ -2,13 +2,10 @@
 """Command-line entry points for spine-db."""
 
 import argparse
+import os
 from pathlib import Path
 from typing import List, Optional
 
-from . import app as app_module
-from . import indexer
-from . import setup as setup_module
-
 
 def _load_files_list(path: str) -> List[str]:
     file_path = Path(path)
@@ -43,6 +40,19 @@ def _add_inject_subcommand(subparsers: argparse._SubParsersAction) -> None:
         action="store_true",
         help="Re-index files that are already in the database",
     )
+    parser.add_argument(
+        "--workers",
+        "-j",
+        type=int,
+        default=None,
+        help="Number of metadata extraction processes (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Number of rows sent per bulk INSERT (default: 500)",
+    )
 
 
 def _add_app_subcommand(subparsers: argparse._SubParsersAction) -> None:
@@ -83,6 +93,11 @@ def _add_setup_subcommand(subparsers: argparse._SubParsersAction) -> None:
         required=True,
         help="Database connection string (e.g., sqlite:///spine_files.db)",
     )
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Print the full traceback on failure",
+    )
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -102,16 +117,34 @@ def _run_inject(
     sources: Optional[List[str]],
     source_list: Optional[str],
     skip_existing: bool,
+    workers: Optional[int] = None,
+    batch_size: Optional[int] = None,
 ) -> int:
     if source_list:
         sources = _load_files_list(source_list)
     if not sources:
         raise ValueError("No files provided for indexing.")
-    indexer.index_files(db_url, sources, skip_existing=skip_existing)
+
+    # Subcommand modules are imported on use, keeping --help fast
+    from . import indexer
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if batch_size is None:
+        batch_size = indexer.BATCH_SIZE
+    indexer.index_files(
+        db_url,
+        sources,
+        skip_existing=skip_existing,
+        batch_size=batch_size,
+        workers=workers,
+    )
     return 0
 
 
 def _run_app(db_url: str, host: str, port: int, debug: bool) -> int:
+    from . import app as app_module
+
     dash_app = app_module.create_app(db_url)
     print("\nStarting SPINE Runs Browser...")
     print(f"Database: {db_url}")
@@ -120,8 +153,13 @@ def _run_app(db_url: str, host: str, port: int, debug: bool) -> int:
     return 0
 
 
-def _run_setup(db_url: str) -> int:
-    setup_module.setup_schema(["--db", db_url])
+def _run_setup(db_url: str, debug: bool = False) -> int:
+    from . import setup as setup_module
+
+    argv = ["--db", db_url]
+    if debug:
+        argv.append("--debug")
+    setup_module.setup_schema(argv)
     return 0
 
 
@@ -135,11 +173,13 @@ def main(argv: Optional[List[str]] = None) -> int:
             args.source,
             args.source_list,
             skip_existing=not args.no_skip_existing,
+            workers=args.workers,
+            batch_size=args.batch_size,
         )
     if args.command == "app":
         return _run_app(args.db, args.host, args.port, args.debug)
     if args.command == "setup":
-        return _run_setup(args.db)
+        return _run_setup(args.db, args.debug)
 
     parser.error("Unknown command")
     return 2
@@ -4,19 +4,88 @@ Reads metadata from HDF5 files and produces canonical Python dicts.
 """
 
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 
 import h5py
 import numpy as np
 
+# Target number of rows read at a time when scanning a dataset column
+READ_BLOCK_SIZE = 1 << 18
 
-def extract_metadata(file_path: str) -> Dict[str, Optional[str]]:
+
+def _column_range(dataset, column: str) -> Tuple[int, int]:
+    """Compute the minimum and maximum of a column of a 1D dataset.
+
+    The column is read in blocks aligned with the dataset's HDF5 chunks,
+    so peak memory stays at one block rather than the whole column.
+
+    Parameters
+    ----------
+    dataset : h5py.Dataset
+        Non-empty 1D compound dataset
+    column : str
+        Name of the field to scan
+
+    Returns
+    -------
+    value_min : int
+        Minimum value of the column
+    value_max : int
+        Maximum value of the column
+    """
+    step = READ_BLOCK_SIZE
+    if dataset.chunks is not None:
+        chunk_rows = dataset.chunks[0]
+        step = max(chunk_rows, step - step % chunk_rows)
+
+    values = dataset.fields(column)
+    value_min, value_max = None, None
+    for start in range(0, len(dataset), step):
+        end = start + step
+        block = values[start:end]
+        block_min, block_max = np.min(block), np.max(block)
+        if value_min is None or block_min < value_min:
+            value_min = block_min
+        if value_max is None or block_max > value_max:
+            value_max = block_max
+
+    return int(value_min), int(value_max)
+
+
+def _get_str_attr(attrs, *keys: str) -> Optional[str]:
+    """Return the first HDF5 attribute found among keys, as a string.
+
+    Parameters
+    ----------
+    attrs : h5py.AttributeManager
+        Attributes of an HDF5 object
+    *keys : str
+        Attribute names to try, in order of preference
+
+    Returns
+    -------
+    value : str or None
+        Attribute value (bytes are decoded), None if no key is present
+    """
+    for key in keys:
+        value = attrs.get(key)
+        if value is not None:
+            if isinstance(value, bytes):
+                return value.decode()
+            return str(value)
+    return None
+
+
+def extract_metadata(file_path: str, resolve: bool = True) -> Dict[str, Optional[str]]:
     """Extract metadata from a SPINE HDF5 output file.
 
     Parameters
     ----------
     file_path : str
         Path to HDF5 file
+    resolve : bool
+        If True, resolve file_path to an absolute path first. Callers that
+        already hold a resolved path can skip the extra filesystem walk.
 
     Returns
     -------
@@ -33,12 +102,18 @@ def extract_metadata(file_path: str) -> Dict[str, Optional[str]]:
         - event_max: maximum event number (int)
         - num_events: total number of events (int)
 
+    Raises
+    ------
+    FileNotFoundError
+        If the file does not exist
+
     Notes
     -----
     Reads metadata from HDF5 root attributes and event data. Falls back to
     inferring from file paths if attributes are not present.
     """
-    file_path = str(Path(file_path).resolve())
+    if resolve:
+        file_path = str(Path(file_path).resolve())
 
     metadata = {
         "file_path": file_path,
@@ -55,30 +130,21 @@ def extract_metadata(file_path: str) -> Dict[str, Optional[str]]:
 
     try:
         with h5py.File(file_path, "r") as f:
-            # Try to read from root attributes
-            attrs = dict(f.attrs)
+            # Try to read from root attributes, looking up only the keys
+            # that are used rather than loading every attribute
+            attrs = f.attrs
 
             # SPINE version
-            if "spine_version" in attrs:
-                metadata["spine_version"] = str(attrs["spine_version"])
-            elif "version" in attrs:
-                metadata["spine_version"] = str(attrs["version"])
+            metadata["spine_version"] = _get_str_attr(attrs, "spine_version", "version")
 
             # spine-prod version
-            if "spine_prod_version" in attrs:
-                metadata["spine_prod_version"] = str(attrs["spine_prod_version"])
+            metadata["spine_prod_version"] = _get_str_attr(attrs, "spine_prod_version")
 
             # Model/config name
-            if "model_name" in attrs:
-                metadata["model_name"] = str(attrs["model_name"])
-            elif "config_name" in attrs:
-                metadata["model_name"] = str(attrs["config_name"])
+            metadata["model_name"] = _get_str_attr(attrs, "model_name", "config_name")
 
             # Dataset name
-            if "dataset_name" in attrs:
-                metadata["dataset_name"] = str(attrs["dataset_name"])
-            elif "dataset" in attrs:
-                metadata["dataset_name"] = str(attrs["dataset"])
+            metadata["dataset_name"] = _get_str_attr(attrs, "dataset_name", "dataset")
 
             # Extract run/subrun/event info from event data
             # SPINE typically stores this in the 'events' dataset
@@ -87,27 +153,33 @@ def extract_metadata(file_path: str) -> Dict[str, Optional[str]]:
 
                 # Try to find run/subrun/event columns
                 # Column names vary: 'run', 'run_id', etc.
-                if "run" in events_data.dtype.names:
-                    runs = events_data["run"][:]
-                    metadata["run"] = int(runs[0]) if len(runs) > 0 else None
-
-                if "subrun" in events_data.dtype.names:
-                    subruns = events_data["subrun"][:]
-                    metadata["subrun"] = int(subruns[0]) if len(subruns) > 0 else None
-
-                if (
-                    "event" in events_data.dtype.names
-                    or "event_id" in events_data.dtype.names
-                ):
-                    if "event" in events_data.dtype.names:
-                        event_col = "event"
-                    else:
-                        event_col = "event_id"
-                    event_ids = events_data[event_col][:]
-                    if len(event_ids) > 0:
-                        metadata["event_min"] = int(np.min(event_ids))
-                        metadata["event_max"] = int(np.max(event_ids))
-                        metadata["num_events"] = len(event_ids)
+                names = frozenset(events_data.dtype.names or ())
+                num_rows = len(events_data)
+
+                # Run and subrun are fixed per file, only read the first row
+                if "run" in names and num_rows > 0:
+                    metadata["run"] = int(events_data[0, "run"])
+
+                if "subrun" in names and num_rows > 0:
+                    metadata["subrun"] = int(events_data[0, "subrun"])
+
+                if "event" in names:
+                    event_col = "event"
+                elif "event_id" in names:
+                    event_col = "event_id"
+                else:
+                    event_col = None
+
+                if event_col is not None and num_rows > 0:
+                    # Prefer the range stored by the writer, if any
+                    event_min = events_data.attrs.get("event_min")
+                    event_max = events_data.attrs.get("event_max")
+                    if event_min is None or event_max is None:
+                        event_min, event_max = _column_range(events_data, event_col)
+
+                    metadata["event_min"] = int(event_min)
+                    metadata["event_max"] = int(event_max)
+                    metadata["num_events"] = num_rows
 
             # Try to infer model name from file path if not in attributes
             if not metadata["model_name"]:
@@ -122,6 +194,8 @@ def extract_metadata(file_path: str) -> Dict[str, Optional[str]]:
                 filename = Path(file_path).stem
                 metadata["dataset_name"] = filename
 
+    except FileNotFoundError:
+        raise
     except Exception as e:
         print(f"WARNING: Could not read metadata from {file_path}: {e}")
 
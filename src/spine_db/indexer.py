@@ -1,10 +1,210 @@
 #!/usr/bin/env python3
 """Indexer helpers - read HDF5 files and insert metadata into database."""
 import glob
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
 from .extractor import extract_metadata, validate_metadata
-from .schema import SpineFile, create_tables, get_engine, get_session
+from .schema import SpineFile, create_tables, enable_wal, get_engine, get_session
+
+# Number of rows sent per bulk INSERT
+BATCH_SIZE = 500
+
+# Maximum number of bound parameters in a single IN (...) lookup
+LOOKUP_CHUNK_SIZE = 1000
+
+# Dialects supporting INSERT ... ON CONFLICT on the file_path unique index
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _metadata_to_row(metadata: dict) -> dict:
+    """Convert extracted metadata into a column -> value mapping."""
+    return {
+        "file_path": metadata["file_path"],
+        "spine_version": metadata["spine_version"],
+        "spine_prod_version": metadata["spine_prod_version"],
+        "model_name": metadata["model_name"],
+        "dataset_name": metadata["dataset_name"],
+        "run": metadata["run"],
+        "subrun": metadata["subrun"],
+        "event_min": metadata["event_min"],
+        "event_max": metadata["event_max"],
+        "num_events": metadata["num_events"],
+    }
+
+
+def _print_indexed(metadata: dict):
+    """Print the summary line for a successfully indexed file."""
+    if metadata["run"] is not None:
+        run_info = f"run={metadata['run']}, subrun={metadata['subrun']}"
+    else:
+        run_info = "run=N/A"
+
+    if metadata["num_events"] is not None:
+        event_info = f"events={metadata['num_events']}"
+    else:
+        event_info = "events=N/A"
+    print(
+        f"INDEXED: {metadata['file_path']} "
+        f"({run_info}, {event_info}, "
+        f"version={metadata['spine_version']})"
+    )
+
+
+def _fetch_existing_paths(session, file_paths: list) -> set:
+    """Return the subset of file_paths that is already in the database.
+
+    Parameters
+    ----------
+    session : sqlalchemy.orm.Session
+        Database session
+    file_paths : list
+        Resolved file paths to look up
+
+    Returns
+    -------
+    existing : set
+        File paths that already have a database entry
+    """
+    existing = set()
+    for start in range(0, len(file_paths), LOOKUP_CHUNK_SIZE):
+        end = start + LOOKUP_CHUNK_SIZE
+        chunk = file_paths[start:end]
+        stmt = select(SpineFile.file_path).where(SpineFile.file_path.in_(chunk))
+        existing.update(session.execute(stmt).scalars())
+    return existing
+
+
+def _expand(files: list):
+    """Lazily expand glob patterns in a list of file paths.
+
+    Parameters
+    ----------
+    files : list
+        List of file paths or glob patterns
+
+    Yields
+    ------
+    file_path : str
+        Matching file path
+    """
+    for pattern in files:
+        if "*" in pattern or "?" in pattern:
+            yield from glob.iglob(pattern)
+        else:
+            yield pattern
+
+
+def _iter_metadata(file_paths: list, workers: int):
+    """Extract metadata from files, in parallel if requested.
+
+    Parameters
+    ----------
+    file_paths : list
+        Resolved file paths to read
+    workers : int
+        Number of worker processes. With a single worker (or a single
+        file), extraction runs in the current process.
+
+    Yields
+    ------
+    file_path : str
+        Path of the file that was read
+    metadata : dict or None
+        Extracted metadata, None if extraction raised
+    error : Exception or None
+        Exception raised during extraction, if any
+    """
+    # More processes than files would only add start-up cost
+    workers = min(workers, len(file_paths))
+    if workers <= 1:
+        for file_path in file_paths:
+            try:
+                yield file_path, extract_metadata(file_path, resolve=False), None
+            except Exception as e:
+                yield file_path, None, e
+        return
+
+    # Use spawn rather than fork, HDF5 library state is not fork-safe
+    context = multiprocessing.get_context("spawn")
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+    try:
+        futures = {
+            pool.submit(extract_metadata, file_path, resolve=False): file_path
+            for file_path in file_paths
+        }
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
+    finally:
+        # If the consumer stops early (e.g. on a database error), drop the
+        # files not yet started instead of reading them all
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _write_batch(session, batch: list, skip_existing: bool = True) -> bool:
+    """Send one bulk INSERT for a batch of rows.
+
+    On PostgreSQL and SQLite, conflicts on file_path are resolved by the
+    database in the same statement: existing rows are left untouched if
+    skip_existing is True and updated otherwise.
+
+    Returns
+    -------
+    success : bool
+        False if the batch violated a uniqueness constraint, in which case
+        the transaction has been rolled back
+    """
+    insert = UPSERT_INSERTS.get(session.get_bind().dialect.name)
+    if insert is not None:
+        stmt = insert(SpineFile)
+        if skip_existing:
+            stmt = stmt.on_conflict_do_nothing(index_elements=["file_path"])
+        else:
+            columns = [key for key in batch[0] if key != "file_path"]
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["file_path"],
+                set_={key: stmt.excluded[key] for key in columns},
+            )
+        session.execute(stmt, batch)
+        return True
+
+    try:
+        session.bulk_insert_mappings(SpineFile, batch)
+        return True
+    except IntegrityError:
+        session.rollback()
+        return False
+
+
+def _insert_row(session, row: dict) -> bool:
+    """Insert and commit a single row, skipping it if it violates uniqueness.
+
+    Used as a fallback when a bulk insert fails, e.g. because another
+    process indexed some of the same files concurrently. The row is
+    reported once its commit succeeds.
+
+    Returns
+    -------
+    inserted : bool
+        False if the row was already present in the database
+    """
+    try:
+        session.bulk_insert_mappings(SpineFile, [row])
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        print(f"SKIP: {row['file_path']} (already in database)")
+        return False
+    _print_indexed(row)
+    return True
 
 
 def index_file(session, file_path: str, skip_existing: bool = True) -> bool:
@@ -35,43 +235,16 @@ def index_file(session, file_path: str, skip_existing: bool = True) -> bool:
 
     # Extract metadata
     try:
-        metadata = extract_metadata(file_path)
+        metadata = extract_metadata(file_path, resolve=False)
         if not validate_metadata(metadata):
             print(f"ERROR: Invalid metadata for {file_path}")
             return False
 
         # Create database entry
-        run = SpineFile(
-            file_path=metadata["file_path"],
-            spine_version=metadata["spine_version"],
-            spine_prod_version=metadata["spine_prod_version"],
-            model_name=metadata["model_name"],
-            dataset_name=metadata["dataset_name"],
-            run=metadata["run"],
-            subrun=metadata["subrun"],
-            event_min=metadata["event_min"],
-            event_max=metadata["event_max"],
-            num_events=metadata["num_events"],
-        )
-
-        session.add(run)
+        session.add(SpineFile(**_metadata_to_row(metadata)))
         session.commit()
 
-        # Build output message
-        if metadata["run"] is not None:
-            run_info = f"run={metadata['run']}, subrun={metadata['subrun']}"
-        else:
-            run_info = "run=N/A"
-
-        if metadata["num_events"] is not None:
-            event_info = f"events={metadata['num_events']}"
-        else:
-            event_info = "events=N/A"
-        print(
-            f"INDEXED: {file_path} "
-            f"({run_info}, {event_info}, "
-            f"version={metadata['spine_version']})"
-        )
+        _print_indexed(metadata)
         return True
 
     except Exception as e:
@@ -80,9 +253,21 @@ def index_file(session, file_path: str, skip_existing: bool = True) -> bool:
         return False
 
 
-def index_files(db_url: str, files: list, skip_existing: bool = True):
+def index_files(
+    db_url: str,
+    files: list,
+    skip_existing: bool = True,
+    batch_size: int = BATCH_SIZE,
+    workers: int = 1,
+):
     """Index multiple HDF5 files into the database.
 
+    Existing entries are looked up with a handful of ``IN (...)`` queries
+    and new rows are written with bulk inserts committed in a single
+    transaction, rather than one query and one commit per file. Metadata
+    extraction can be spread over a pool of worker processes while the
+    main process writes the results.
+
     Parameters
     ----------
     db_url : str
@@ -91,35 +276,89 @@ def index_files(db_url: str, files: list, skip_existing: bool = True):
         List of file paths or glob patterns
     skip_existing : bool
         If True, skip files that are already in the database
+    batch_size : int
+        Number of rows sent per bulk INSERT
+    workers : int, default 1
+        Number of metadata extraction processes. With more than one, a
+        spawn-based process pool is started, so scripts calling this must
+        guard their entry point with ``if __name__ == "__main__":``.
     """
     # Create engine and session
     engine = get_engine(db_url)
     create_tables(engine)
+    enable_wal(engine)
     session = get_session(engine)
 
-    # Expand file list
-    file_list = []
-    for pattern in files:
-        if "*" in pattern or "?" in pattern:
-            file_list.extend(glob.glob(pattern))
-        else:
-            file_list.append(pattern)
+    # Expand and resolve the file list once, dropping duplicates. Missing
+    # files are reported when extraction fails to open them.
+    file_paths = list(
+        dict.fromkeys(str(Path(file_path).resolve()) for file_path in _expand(files))
+    )
 
-    print(f"Found {len(file_list)} file(s) to index")
+    print(f"Found {len(file_paths)} file(s) to index")
 
-    # Index each file
     success_count = 0
     error_count = 0
 
-    for file_path in file_list:
-        if Path(file_path).exists():
-            if index_file(session, file_path, skip_existing):
+    # Check which files already exist in a few batched lookups
+    if skip_existing:
+        existing = _fetch_existing_paths(session, file_paths)
+        for file_path in file_paths:
+            if file_path in existing:
+                print(f"SKIP: {file_path} (already in database)")
                 success_count += 1
-            else:
+        file_paths = [path for path in file_paths if path not in existing]
+
+    # Extract metadata and insert in batches, committing once at the end
+    rows = []
+    pending = []
+    bulk = True
+    written = 0
+    try:
+        for file_path, metadata, error in _iter_metadata(file_paths, workers):
+            if isinstance(error, FileNotFoundError):
+                print(f"WARNING: File not found: {file_path}")
+                error_count += 1
+                continue
+            if error is not None:
+                print(f"ERROR: Failed to index {file_path}: {error}")
                 error_count += 1
+                continue
+            if not validate_metadata(metadata):
+                print(f"ERROR: Invalid metadata for {file_path}")
+                error_count += 1
+                continue
+
+            row = _metadata_to_row(metadata)
+            rows.append(row)
+
+            if bulk:
+                pending.append(row)
+                if len(pending) >= batch_size:
+                    bulk = _write_batch(session, pending, skip_existing)
+                    pending = []
+
+        if bulk and pending:
+            bulk = _write_batch(session, pending, skip_existing)
+        if bulk:
+            session.commit()
+            # Files are only reported once their rows are committed
+            for row in rows:
+                _print_indexed(row)
+            written = len(rows)
         else:
-            print(f"WARNING: File not found: {file_path}")
-            error_count += 1
+            # Some files were indexed concurrently, salvage the rest row by row
+            for row in rows:
+                _insert_row(session, row)
+                written += 1
+
+    except Exception as e:
+        print(f"ERROR: Failed to write batch to database: {e}")
+        session.rollback()
+        # Every file that was not committed failed, including those the
+        # extraction loop had not reached yet
+        error_count = len(file_paths) - written
+    success_count += written
 
     print(f"\nIndexing complete: {success_count} success, {error_count} errors")
 